@@ -9,6 +9,7 @@ Highlights:
 - Clear START/END headers and safe code fences per file.
 - Skips likely-binary files via heuristic.
 - Deterministic ordering; configurable size limit and filters.
+- Optional --cache keeps per-file sniff/fence results in <output>.cache.json between runs.
 
 Usage:
   python3 pack_project.py -r /path/to/project -o project_bundle.txt
@@ -16,11 +17,18 @@ Usage:
 
 import argparse
 import fnmatch
+import functools
+import json
+import operator
 import os
 import re
 import sys
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import Iterable, List, Set
+from typing import IO, Deque, Dict, FrozenSet, Iterable, List, Optional, Pattern, TextIO, Tuple, Union
 
 
 DEFAULT_EXCLUDE_DIRS = {
@@ -74,6 +82,13 @@ DEFAULT_EXCLUDE_EXTS = {
     "ico", "icns", "map",
 }
 
+# CLI defaults for --exts / --ignore-exts, plus the sets they parse to, so main() can skip
+# re-parsing the (long) default strings when the user doesn't override them
+_DEFAULT_EXTS_STR = ",".join(sorted(DEFAULT_EXTS))
+_DEFAULT_EXTS_FS = frozenset(e.lower() for e in DEFAULT_EXTS)
+_DEFAULT_IGNORE_EXTS_STR = ",".join(sorted(DEFAULT_EXCLUDE_EXTS))
+_DEFAULT_IGNORE_EXTS_FS = frozenset(e.lower() for e in DEFAULT_EXCLUDE_EXTS)
+
 # Best-effort mapping for nicer code block language hints
 LANG_MAP = {
     "rs": "rust",
@@ -131,48 +146,136 @@ NAME_LANG_OVERRIDES = {
     "readme.md": "markdown",
 }
 
-
-def is_probably_binary(path: Path, sniff_bytes: int = 4096) -> bool:
+# Lowercased file names always included regardless of extension
+INCLUDE_NAMES = frozenset(n.lower() for n in NAME_LANG_OVERRIDES)
+
+# Large output buffer: the bundle is written sequentially and can reach many MB
+OUTPUT_BUFFER_BYTES = 1024 * 1024
+
+# Bytes considered "text" by is_probably_binary (printable ASCII plus common control chars)
+_TEXT_CHARS = bytes({7, 8, 9, 10, 12, 13, 27} | set(range(0x20, 0x7F)))
+
+# Leading signatures of common binary formats; a match skips the ratio scan entirely.
+# Each contains a non-printable byte: all-ASCII magics (ID3, RIFF, OggS, GIF8, %PDF) are
+# plausible openings for text files, and real files of those formats fail the NUL/ratio check.
+_MAGIC_PREFIXES = (
+    b"\x89PNG",            # PNG
+    b"\xff\xd8\xff",       # JPEG
+    b"PK\x03\x04",         # ZIP (also jar/docx/xlsx/...)
+    b"Rar!\x1a\x07",       # RAR
+    b"\x7fELF",            # ELF
+    b"MZ\x90\x00",         # PE/DOS executable (full header, bare "MZ" is too common in text)
+    b"\x00\x00\x01\x00",   # ICO
+)
+
+# Files larger than this are streamed into the bundle instead of being read into memory
+STREAM_MIN_BYTES = 128 * 1024
+
+# Streamed content is staged in an in-memory spool (to learn the fence first). This caps the
+# total size of spooled files in flight; a single file larger than this spills to disk.
+SPOOL_BUDGET_BYTES = 64 * 1024 * 1024
+
+# Characters per read when streaming a large file
+STREAM_CHUNK_CHARS = 64 * 1024
+
+# Per-file preparation is mostly I/O wait, so oversubscribe the cores
+DEFAULT_JOBS = min(32, (os.cpu_count() or 1) * 4)
+
+# Sidecar cache of per-file sniff/fence results, reused across runs while (mtime, size) match
+CACHE_SUFFIX = ".cache.json"
+CACHE_VERSION = 1
+# Files modified this close to the run's start aren't cached: a later same-size edit could land
+# within the same mtime tick and go unnoticed (the "racy clean" problem)
+CACHE_RACY_NS = 2_000_000_000
+
+# Size reported by iter_files for entries it could not stat
+UNKNOWN_SIZE = -1
+
+# Outcomes of preparing a single file for the bundle
+PACK_WRITTEN = "written"
+PACK_STREAM = "stream"
+PACK_TOO_LARGE = "too_large"
+PACK_BINARY = "binary"
+PACK_UNREADABLE = "unreadable"  # sniff read failed; reported as binary, but never cached
+PACK_ERROR = "error"
+
+
+def is_probably_binary(path: str, sniff_bytes: int = 4096) -> Optional[bool]:
+    # None when the file can't be read, so callers can tell "unreadable" from "binary"
     try:
-        with path.open("rb") as f:
+        with open(path, "rb") as f:
             chunk = f.read(sniff_bytes)
     except Exception:
-        return True  # if unreadable, treat as binary to be safe
+        return None
     if not chunk:
         return False
+    if chunk.startswith(_MAGIC_PREFIXES):
+        return True
     if b"\x00" in chunk:
         return True
-    text_chars = bytearray({7, 8, 9, 10, 12, 13, 27} | set(range(0x20, 0x7F)))
-    nontext = sum(b not in text_chars for b in chunk)
+    # Deleting every text byte in C leaves exactly the non-text ones to count
+    nontext = len(chunk.translate(None, delete=_TEXT_CHARS))
     return (nontext / max(1, len(chunk))) > 0.30
 
 
-def choose_code_fence(content: str) -> str:
-    runs = re.findall(r"`+", content)
-    longest = max((len(r) for r in runs), default=0)
+def _fence_for_run(longest: int) -> str:
     return "`" * (longest + 2 if longest >= 3 else 3)
 
 
-def detect_lang_for(path: Path) -> str:
-    name = path.name.lower()
-    if name in NAME_LANG_OVERRIDES:
-        return NAME_LANG_OVERRIDES[name]
-    stem = path.suffix.lower().lstrip(".")
-    if stem in LANG_MAP:
-        return LANG_MAP[stem]
-    return "text"
+def _backtick_runs(text: str, carry: int = 0) -> Tuple[int, int]:
+    # Returns (longest run, trailing run) for text, where a run at its very start extends the
+    # `carry` backticks that ended the previous chunk, so chunked scans match a whole scan
+    if not text:
+        return carry, carry
+    i = text.find("`")
+    if i == -1:
+        return carry, 0
+    # Hop between backtick runs with str.find (C speed) and only count the runs themselves
+    longest = carry
+    n = len(text)
+    run = j = 0
+    while i != -1:
+        j = i + 1
+        while j < n and text[j] == "`":
+            j += 1
+        run = j - i + (carry if i == 0 else 0)
+        if run > longest:
+            longest = run
+        i = text.find("`", j)
+    return longest, (run if j == n else 0)
 
 
-def should_include_file(path: Path, exts: Set[str], include_names: Set[str]) -> bool:
-    name_lower = path.name.lower()
-    if name_lower in include_names:
-        return True
-    ext = path.suffix.lower().lstrip(".")
-    if ext in exts:
-        return True
-    if path.name.lower() in NAME_LANG_OVERRIDES:
+def choose_code_fence(content: str) -> str:
+    if "`" not in content:
+        return "```"
+    return _fence_for_run(_backtick_runs(content)[0])
+
+
+def _suffix_of(name: str) -> str:
+    # Same rule as PurePath.suffix (minus the dot) without building a Path: dotfiles and
+    # names ending in "." have no extension
+    i = name.rfind(".")
+    return name[i + 1:] if 0 < i < len(name) - 1 else ""
+
+
+@functools.lru_cache(maxsize=None)
+def _lang_for_suffix(suffix: str) -> str:
+    # Keyed on the raw suffix: projects only use a handful, so lower()/lookup run once each
+    return LANG_MAP.get(suffix.lower(), "text")
+
+
+def detect_lang_for(name: str) -> str:
+    name_lower = name.lower()
+    if name_lower in NAME_LANG_OVERRIDES:
+        return NAME_LANG_OVERRIDES[name_lower]
+    return _lang_for_suffix(_suffix_of(name))
+
+
+def should_include_file(name: str, exts: FrozenSet[str], include_names: FrozenSet[str] = INCLUDE_NAMES) -> bool:
+    # include_names already covers NAME_LANG_OVERRIDES, so one name lookup suffices
+    if name.lower() in include_names:
         return True
-    return False
+    return _suffix_of(name).lower() in exts
 
 
 def _read_ignore_file(ignore_file: Path) -> List[str]:
@@ -188,61 +291,312 @@ def _read_ignore_file(ignore_file: Path) -> List[str]:
     return patterns
 
 
-def _match_any_glob(rel_posix_lower: str, patterns: List[str]) -> bool:
+def _load_cache(cache_file: Path) -> Dict[str, list]:
+    # Entries: abs path -> [mtime_ns, size, is_binary, fence_len or None]; any problem = empty
+    try:
+        data = json.loads(cache_file.read_text(encoding="utf-8"))
+        if data.get("version") == CACHE_VERSION and isinstance(data.get("files"), dict):
+            return {k: v for k, v in data["files"].items() if _valid_cache_entry(v)}
+    except Exception:
+        pass
+    return {}
+
+
+def _valid_cache_entry(entry) -> bool:
+    # A malformed sidecar must never change the bundle: anything off-shape is dropped
+    if not isinstance(entry, list) or len(entry) != 4:
+        return False
+    mtime_ns, size, is_binary, fence_len = entry
+    # bool is an int subclass, so exclude it explicitly from the int fields
+    return (
+        type(mtime_ns) is int and type(size) is int and type(is_binary) is bool
+        and (fence_len is None or (type(fence_len) is int and fence_len > 0))
+    )
+
+
+def _save_cache(cache_file: Path, entries: Dict[str, list]) -> None:
+    # Only this run's files are written back, so deleted/filtered-out entries age out on their own
+    tmp = cache_file.with_name(cache_file.name + ".tmp")
+    try:
+        tmp.write_text(json.dumps({"version": CACHE_VERSION, "files": entries}), encoding="utf-8")
+        os.replace(tmp, cache_file)
+    except Exception as e:
+        sys.stderr.write(f"[warn] Could not write cache {cache_file}: {e}\n")
+
+
+def _parse_exts(value: str, default_str: str, default_fs: FrozenSet[str]) -> FrozenSet[str]:
+    if value == default_str:
+        return default_fs
+    return frozenset(filter(None, (s.strip().lower() for s in value.split(","))))
+
+
+def _normalize_globs(patterns: List[str]) -> List[str]:
+    pats = []
     for pat in patterns:
-        p = pat.replace("\\", "/").lower()
-        if p.startswith("/"):
-            p = p.lstrip("/")
-        if fnmatch.fnmatch(rel_posix_lower, p):
-            return True
-    return False
+        p = pat.strip().replace("\\", "/").lower().lstrip("/")
+        if p:
+            pats.append(p)
+    return pats
+
+
+def _join_globs(pats: List[str]) -> Optional[Pattern[str]]:
+    if not pats:
+        return None
+    alternation = "|".join("(?:%s)" % fnmatch.translate(p).removesuffix("\\Z") for p in pats)
+    return re.compile("(?:%s)\\Z" % alternation)
+
+
+def _compile_globs(patterns: List[str]) -> Optional[Pattern[str]]:
+    # One alternation regex per glob list, matched against lowercased root-relative POSIX paths
+    return _join_globs(_normalize_globs(patterns))
+
+
+def _compile_dir_globs(patterns: List[str]) -> Optional[Pattern[str]]:
+    # Only "<dir-glob>/*" and "<dir-glob>/**" are known to cover every file below a matching
+    # directory ('*' crosses '/' in fnmatch), so those are the only ones safe to prune on.
+    dir_pats = []
+    for p in _normalize_globs(patterns):
+        head = p.rstrip("*")
+        if head != p and head.endswith("/") and head.strip("/"):
+            dir_pats.append(head.rstrip("/"))
+    return _join_globs(dir_pats)
 
 
 def iter_files(
     root: Path,
-    exclude_dirs: Set[str],
+    exclude_dirs: FrozenSet[str],
     include_globs: List[str],
     ignore_globs: List[str],
-    ignore_exts: Set[str],
-    exts: Set[str],
+    ignore_exts: FrozenSet[str],
+    exts: FrozenSet[str],
     prefer_include: bool,
     follow_symlinks: bool,
-) -> Iterable[Path]:
-    exclude_dirs_norm = {d.lower() for d in exclude_dirs}
-    include_names = {n.lower() for n in NAME_LANG_OVERRIDES.keys()}
-    inc_globs = [g.strip() for g in include_globs if g.strip()]
-    ign_globs = [g.strip() for g in ignore_globs if g.strip()]
-
-    for dirpath, dirnames, filenames in os.walk(root, followlinks=follow_symlinks):
-        # Prune excluded directories
-        for d in list(dirnames):
-            if d.lower() in exclude_dirs_norm:
-                dirnames.remove(d)
-
-        for fname in filenames:
-            p = Path(dirpath) / fname
-            rel = p.relative_to(root)
-            rel_posix = str(rel).replace("\\", "/")
-            rel_lower = rel_posix.lower()
+) -> Iterable[Tuple[str, str, str, int, int]]:
+    exclude_dirs_norm = frozenset(d.lower() for d in exclude_dirs)
+    inc_re = _compile_globs(include_globs)
+    ign_re = _compile_globs(ignore_globs)
+    # Force-included files may live under ignored dirs, so only prune when ignores win
+    ign_dir_re = None if (prefer_include and inc_re is not None) else _compile_dir_globs(ignore_globs)
+
+    def _accept(name: str, rel_lower: str) -> bool:
+        # Prefer include globs override ignores when requested
+        if prefer_include and inc_re is not None and inc_re.match(rel_lower) is not None:
+            return True
 
-            # Prefer include globs override ignores when requested
-            if prefer_include and inc_globs and _match_any_glob(rel_lower, inc_globs):
-                yield p
+        # Ignore by glob/extension (default extensions included)
+        ext = _suffix_of(name).lower()
+        if (ign_re is not None and ign_re.match(rel_lower) is not None) or (ext and ext in ignore_exts):
+            return False
+
+        # Non-preferred include globs (force-include things that otherwise wouldn't pass)
+        if not prefer_include and inc_re is not None and inc_re.match(rel_lower) is not None:
+            return True
+
+        # Base include rule (extensions + name overrides)
+        return should_include_file(name, exts)
+
+    # DirEntry.path is "<root>/<rel>" since scanning starts from the absolute root string,
+    # so the relative path is a plain slice instead of a relpath/relative_to per entry
+    root_str = str(root)
+    root_prefix_len = len(os.path.join(root_str, ""))
+
+    def _rel_posix(path: str) -> str:
+        return path[root_prefix_len:].replace("\\", "/")
+
+    def _walk(dir_path: str) -> Iterable[Tuple[str, str, str, int, int]]:
+        try:
+            with os.scandir(dir_path) as it:
+                entries = list(it)
+        except OSError:
+            return  # unreadable directory; mirror os.walk's default of skipping it
+
+        for entry in entries:
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                # Same as os.walk: treat it as a file, so the read fails later and gets reported
+                is_dir = False
+
+            if is_dir:
+                # Prune excluded directories (and symlinked ones unless following links)
+                if entry.name.lower() in exclude_dirs_norm:
+                    continue
+                if not follow_symlinks and entry.is_symlink():
+                    continue
+                # Skip whole subtrees covered by an ignore glob instead of filtering each file
+                if ign_dir_re is not None:
+                    rel_dir_lower = _rel_posix(entry.path).lower()
+                    if ign_dir_re.match(rel_dir_lower) is not None:
+                        continue
+                yield from _walk(entry.path)
                 continue
 
-            # Ignore by glob/extension (default extensions included)
-            ext = p.suffix.lower().lstrip(".")
-            if (ign_globs and _match_any_glob(rel_lower, ign_globs)) or (ext and ext in ignore_exts):
+            rel_posix = _rel_posix(entry.path)
+            rel_lower = rel_posix.lower()
+
+            if not _accept(entry.name, rel_lower):
                 continue
 
-            # Non-preferred include globs (force-include things that otherwise wouldn't pass)
-            if not prefer_include and inc_globs and _match_any_glob(rel_lower, inc_globs):
-                yield p
+            # Stat once here; size/mtime travel with the path so main() needn't re-stat
+            try:
+                st = entry.stat()
+            except OSError:
+                # Still yield it (size UNKNOWN_SIZE) so main() counts and reports the failure
+                yield entry.path, rel_posix, rel_lower, UNKNOWN_SIZE, 0
                 continue
+            # rel_lower rides along as the ready-made sort key
+            yield entry.path, rel_posix, rel_lower, st.st_size, st.st_mtime_ns
+
+    yield from _walk(root_str)
 
-            # Base include rule (extensions + name overrides)
-            if should_include_file(p, exts, include_names):
-                yield p
+
+def _open_text(fp: str) -> TextIO:
+    # newline=None: universal-newline decoding folds CRLF/CR to LF in the C IO layer
+    return open(fp, "r", encoding="utf-8", errors="replace", newline=None)
+
+
+def _spool_text(fp: str) -> Tuple[IO[str], str]:
+    # Single pass over a large file: decode + normalize into a spool while tracking backtick
+    # runs, so the fence is known before anything is written and the source is read only once
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_BUDGET_BYTES, mode="w+", encoding="utf-8", newline="\n")
+    try:
+        longest = carry = 0
+        with _open_text(fp) as src:
+            while True:
+                chunk = src.read(STREAM_CHUNK_CHARS)
+                if not chunk:
+                    break
+                run, carry = _backtick_runs(chunk, carry)
+                if run > longest:
+                    longest = run
+                spool.write(chunk)
+        spool.seek(0)
+    except BaseException:
+        spool.close()
+        raise
+    return spool, _fence_for_run(longest)
+
+
+def _pack_one(
+    fp: str, rel_str: str, size: int, max_bytes: int, code_fences: bool, cached: Optional[list],
+) -> Tuple[str, str, str, Union[str, IO[str]], str]:
+    # Returns (status, rel_str, text, source, fence). text is the finished section for
+    # PACK_WRITTEN or the error message for PACK_ERROR. For PACK_STREAM, source is the spooled
+    # content, or the file path when the fence is already known (or not needed).
+    # `cached` is a still-valid cache entry for this file, if any; it replaces the sniff/scan.
+    try:
+        if size == UNKNOWN_SIZE:
+            # The walk couldn't stat it; retry so the error (or a recovered size) is genuine
+            size = os.stat(fp).st_size
+        if max_bytes > 0 and size > max_bytes:
+            return PACK_TOO_LARGE, rel_str, "", fp, ""
+        if cached is not None:
+            if cached[2]:
+                return PACK_BINARY, rel_str, "", fp, ""
+        else:
+            sniff = is_probably_binary(fp)
+            if sniff is None:
+                return PACK_UNREADABLE, rel_str, "", fp, ""
+            if sniff:
+                return PACK_BINARY, rel_str, "", fp, ""
+        known_fence = "`" * cached[3] if cached is not None and cached[3] else ""
+
+        if size > STREAM_MIN_BYTES:
+            if not code_fences:
+                return PACK_STREAM, rel_str, "", fp, ""
+            if known_fence:
+                return PACK_STREAM, rel_str, "", fp, known_fence
+            spool, fence = _spool_text(fp)
+            return PACK_STREAM, rel_str, "", spool, fence
+
+        with _open_text(fp) as f:
+            content = f.read()
+        lang = detect_lang_for(rel_str.rpartition("/")[2])
+
+        # Assemble the whole section first so each file costs one write/encode
+        fence = ""
+        parts = [f"===== START FILE: {rel_str} =====\n"]
+        if not code_fences:
+            parts.append(content)
+            if not content.endswith("\n"):
+                parts.append("\n")
+        else:
+            fence = known_fence or choose_code_fence(content)
+            parts.append(f"{fence}{lang}\n")
+            parts.append(content)
+            if not content.endswith("\n"):
+                parts.append("\n")
+            parts.append(f"{fence}\n")
+        parts.append(f"===== END FILE: {rel_str} =====\n\n")
+        return PACK_WRITTEN, rel_str, "".join(parts), fp, fence
+
+    except Exception as e:
+        return PACK_ERROR, rel_str, str(e), fp, ""
+
+
+def _write_streamed(out: TextIO, src: IO[str], rel_str: str, fence: str) -> None:
+    # Copy already-open text through in fixed-size chunks so memory stays O(chunk), not O(file)
+    if fence:
+        lang = detect_lang_for(rel_str.rpartition("/")[2])
+        out.write(f"===== START FILE: {rel_str} =====\n{fence}{lang}\n")
+    else:
+        out.write(f"===== START FILE: {rel_str} =====\n")
+    last = ""
+    read_error = None
+    while True:
+        try:
+            chunk = src.read(STREAM_CHUNK_CHARS)
+        except Exception as e:
+            read_error = e
+            break
+        if not chunk:
+            break
+        out.write(chunk)
+        last = chunk
+    # The header is already out, so a failed read still closes the section (with a marker)
+    # rather than leaving a START without an END in the bundle
+    tail = [] if last.endswith("\n") else ["\n"]
+    if fence:
+        tail.append(f"{fence}\n")
+    if read_error is not None:
+        tail.append(f"===== TRUNCATED FILE: {rel_str}: {read_error} =====\n")
+    tail.append(f"===== END FILE: {rel_str} =====\n\n")
+    out.write("".join(tail))
+    if read_error is not None:
+        raise read_error
+
+
+def _may_spool(size: int, max_bytes: int, code_fences: bool) -> bool:
+    return code_fences and size > STREAM_MIN_BYTES and not (max_bytes > 0 and size > max_bytes)
+
+
+def _pack_files_ordered(
+    files: List[Tuple[str, str, str, int, int]],
+    max_bytes: int,
+    code_fences: bool,
+    jobs: int,
+    cache: Dict[str, list],
+) -> Iterable[Tuple[str, str, str, Union[str, IO[str]], str]]:
+    # Files are prepared concurrently but yielded in input order, so the bundle stays
+    # deterministic. Only a bounded window of sections is in flight to cap memory use, and
+    # files that will be spooled also count against SPOOL_BUDGET_BYTES so spools stay in RAM.
+    window = jobs * 4
+    spool_in_flight = 0
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        pending: Deque[Tuple[Future, int]] = deque()
+        for fp, rel_str, _, size, mtime_ns in files:
+            spool_bytes = size if _may_spool(size, max_bytes, code_fences) else 0
+            while pending and (len(pending) >= window or spool_in_flight + spool_bytes > SPOOL_BUDGET_BYTES):
+                future, done_bytes = pending.popleft()
+                spool_in_flight -= done_bytes
+                yield future.result()
+            cached = cache.get(fp)
+            if cached is not None and (cached[0] != mtime_ns or cached[1] != size):
+                cached = None
+            spool_in_flight += spool_bytes
+            pending.append((pool.submit(_pack_one, fp, rel_str, size, max_bytes, code_fences, cached), spool_bytes))
+        while pending:
+            yield pending.popleft()[0].result()
 
 
 def main():
@@ -255,14 +609,14 @@ def main():
                     help="Do not wrap each file content in a code fence.")
     ap.add_argument("--exclude-dirs", type=str, default=",".join(sorted(DEFAULT_EXCLUDE_DIRS)),
                     help="Comma-separated list of directory names to exclude (exact names).")
-    ap.add_argument("--exts", type=str, default=",".join(sorted(DEFAULT_EXTS)),
+    ap.add_argument("--exts", type=str, default=_DEFAULT_EXTS_STR,
                     help="Comma-separated list of file extensions to include (without dots).")
     ap.add_argument("--include-globs", type=str, default="",
                     help="Comma-separated glob patterns (relative to root) to force-include. Supports *, **, ?.")
     ap.add_argument("--ignore-globs", "--unwanted-globs", dest="ignore_globs", type=str, default="",
                     help="Comma-separated glob patterns to skip (relative to root). Supports *, **, ?.")
     ap.add_argument("--ignore-exts", "--exclude-exts", dest="ignore_exts", type=str,
-                    default=",".join(sorted(DEFAULT_EXCLUDE_EXTS)),
+                    default=_DEFAULT_IGNORE_EXTS_STR,
                     help="Comma-separated file extensions to skip (without dots). "
                          "Default includes common binary/media/archive types.")
     ap.add_argument("--ignore-file", type=Path, default=None,
@@ -270,6 +624,10 @@ def main():
     ap.add_argument("--prefer-include", action="store_true",
                     help="If set, include-globs override ignore globs/exts.")
     ap.add_argument("--follow-symlinks", action="store_true", help="Follow symlinks.")
+    ap.add_argument("--jobs", type=int, default=0,
+                    help=f"Worker threads reading/sniffing files (0 = auto, currently {DEFAULT_JOBS}).")
+    ap.add_argument("--cache", action="store_true",
+                    help=f"Reuse per-file sniff/fence results across runs via '<output>{CACHE_SUFFIX}'.")
     args = ap.parse_args()
 
     root: Path = args.root.resolve()
@@ -277,15 +635,15 @@ def main():
         print(f"Error: root directory not found or not a directory: {root}", file=sys.stderr)
         sys.exit(1)
 
-    exclude_dirs = set(filter(None, (s.strip() for s in args.exclude_dirs.split(","))))
-    exts = set(filter(None, (s.strip().lower() for s in args.exts.split(","))))
+    exclude_dirs = frozenset(filter(None, (s.strip() for s in args.exclude_dirs.split(","))))
+    exts = _parse_exts(args.exts, _DEFAULT_EXTS_STR, _DEFAULT_EXTS_FS)
     include_globs = [g.strip() for g in args.include_globs.split(",") if g.strip()]
 
     ignore_globs_cli = [g.strip() for g in args.ignore_globs.split(",") if g.strip()]
     ignore_globs_file = _read_ignore_file(args.ignore_file) if args.ignore_file else []
     ignore_globs = ignore_globs_cli + ignore_globs_file
 
-    ignore_exts = set(filter(None, (s.strip().lower() for s in args.ignore_exts.split(","))))
+    ignore_exts = _parse_exts(args.ignore_exts, _DEFAULT_IGNORE_EXTS_STR, _DEFAULT_IGNORE_EXTS_FS)
 
     files = list(iter_files(
         root=root,
@@ -297,7 +655,20 @@ def main():
         prefer_include=args.prefer_include,
         follow_symlinks=args.follow_symlinks,
     ))
-    files.sort(key=lambda p: str(p.relative_to(root)).replace("\\", "/").lower())
+    files.sort(key=operator.itemgetter(2))
+
+    # The cache is .json (an included ext): never pack it when the output sits under root, even
+    # on runs without --cache, since an earlier run may have left one behind
+    cache_path = args.output.with_name(args.output.name + CACHE_SUFFIX)
+    cache_str = str(cache_path.resolve())
+    files = [f for f in files if f[0] != cache_str]
+
+    cache_file = cache_path if args.cache else None
+    cache: Dict[str, list] = {}
+    new_cache: Dict[str, list] = {}
+    racy_after_ns = time.time_ns() - CACHE_RACY_NS
+    if cache_file is not None:
+        cache = _load_cache(cache_file)
 
     written = 0
     skipped_binary = 0
@@ -306,45 +677,40 @@ def main():
 
     try:
         args.output.parent.mkdir(parents=True, exist_ok=True)
-        with args.output.open("w", encoding="utf-8", newline="\n") as out:
+        with args.output.open("w", encoding="utf-8", newline="\n", buffering=OUTPUT_BUFFER_BYTES) as out:
             out.write(f"PROJECT_ROOT: {root}\n")
             out.write(f"FILE_COUNT: {len(files)}\n")
             out.write("=" * 80 + "\n\n")
 
-            for fp in files:
-                rel = fp.relative_to(root)
-                rel_str = str(rel).replace("\\", "/")
-                try:
-                    size = fp.stat().st_size
-                    if args.max_bytes > 0 and size > args.max_bytes:
-                        skipped_too_large += 1
-                        continue
-                    if is_probably_binary(fp):
-                        skipped_binary += 1
-                        continue
-
-                    content = fp.read_text(encoding="utf-8", errors="replace")
-                    content = content.replace("\r\n", "\n").replace("\r", "\n")
-                    lang = detect_lang_for(fp)
-
-                    out.write(f"===== START FILE: {rel_str} =====\n")
-                    if args.no_code_fences:
-                        out.write(content)
-                        if not content.endswith("\n"):
-                            out.write("\n")
-                    else:
-                        fence = choose_code_fence(content)
-                        out.write(f"{fence}{lang}\n")
-                        out.write(content)
-                        if not content.endswith("\n"):
-                            out.write("\n")
-                        out.write(f"{fence}\n")
-                    out.write(f"===== END FILE: {rel_str} =====\n\n")
+            jobs = args.jobs if args.jobs > 0 else DEFAULT_JOBS
+            results = _pack_files_ordered(files, args.max_bytes, not args.no_code_fences, jobs, cache)
+            for (fp, _, _, size, mtime_ns), (status, rel_str, text, source, fence) in zip(files, results):
+                if status == PACK_WRITTEN:
+                    out.write(text)
                     written += 1
-
-                except Exception as e:
+                elif status == PACK_STREAM:
+                    try:
+                        # Open (or adopt the spool) before writing, so a vanished file leaves no
+                        # stub; a read failure mid-copy is closed off as a TRUNCATED section
+                        with (_open_text(source) if isinstance(source, str) else source) as src:
+                            _write_streamed(out, src, rel_str, fence)
+                        written += 1
+                    except Exception as e:
+                        status = PACK_ERROR
+                        skipped_errors += 1
+                        sys.stderr.write(f"[warn] Skipping {rel_str}: {e}\n")
+                elif status == PACK_TOO_LARGE:
+                    skipped_too_large += 1
+                elif status in (PACK_BINARY, PACK_UNREADABLE):
+                    skipped_binary += 1
+                else:
                     skipped_errors += 1
-                    sys.stderr.write(f"[warn] Skipping {rel_str}: {e}\n")
+                    sys.stderr.write(f"[warn] Skipping {rel_str}: {text}\n")
+
+                # Unstat-able entries carry no real mtime/size, so there's nothing to key them on
+                if (status in (PACK_WRITTEN, PACK_STREAM, PACK_BINARY) and size != UNKNOWN_SIZE
+                        and mtime_ns < racy_after_ns):
+                    new_cache[fp] = [mtime_ns, size, status == PACK_BINARY, len(fence) or None]
 
             out.write("=" * 80 + "\n")
             out.write(f"SUMMARY: written={written}, skipped_binary={skipped_binary}, "
@@ -354,6 +720,9 @@ def main():
         print(f"Failed to write output: {e}", file=sys.stderr)
         sys.exit(2)
 
+    if cache_file is not None:
+        _save_cache(cache_file, new_cache)
+
     print(f"Done. Wrote {written} files to {args.output}. "
           f"(binary skipped: {skipped_binary}, too large: {skipped_too_large}, errors: {skipped_errors})")
     sys.exit(0)